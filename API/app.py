@@ -1,41 +1,127 @@
 import json
+import os
+import re
+import atexit
 import http.server
-import socketserver
+import threading
 import base64
 import getpass
-from urllib.parse import urlparse, parse_qs
+import heapq
+import hmac
+import math
+import secrets
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from operator import itemgetter
+from urllib.parse import parse_qs, urlsplit
 from datetime import datetime
 
+# orjson is optional: it encodes straight to bytes and is several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads  # its JSONDecodeError subclasses json.JSONDecodeError
+else:
+    def json_dumps(data):
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+    json_loads = json.loads
+
 # JSON file storage
 TRANSACTIONS_FILE = "transactions.json"
-LOGS_FILE = "logs.json"
+LOGS_FILE = "logs.jsonl"  # one JSON object per line, only ever appended to
+LEGACY_LOGS_FILE = "logs.json"  # whole-array format, converted once by init_json_files
+LOG_BUFFER_SIZE = 8192  # log lines are buffered and written out by the background writer
 API_KEY_FILE = ".api_key"
 RATE_LIMIT = 1000  # requests per minute (By defaults to 1000 requests/minute)
+MAX_TRACKED_CLIENTS = 10_000  # least recently seen IPs are forgotten beyond this
+PAGE_SIZE = 100  # default GET /transactions page size
+MAX_PAGE_SIZE = 1000
+FLUSH_DELAY = 0.1  # seconds a write waits so a burst of mutations becomes one file rewrite
+FLUSH_RETRY_DELAY = 1.0  # seconds the writer waits after a failed write before trying again
+KEEPALIVE_TIMEOUT = 15  # seconds an idle keep-alive connection may hold its thread
+LISTEN_BACKLOG = 128  # pending connections the OS queues; socketserver's default of 5 drops bursts
+
+# Fixed per-request data, built once at import instead of inside the handlers
+REQUIRED_FIELDS = ('type', 'amount', 'sender', 'receiver', 'timestamp')
+RESPONSE_HEADERS = (
+    ('Content-type', 'application/json'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type, X-API-Key'),
+)
+# /{endpoint}[/{id}][...][?{query}] matched in one pass by the C regex engine
+PATH_PATTERN = re.compile(r'/([^/?#]*)(?:/([^/?#]*))?[^?#]*(?:\?([^#]*))?')
+RESPONSE_HEADER_BLOCK = ''.join('%s: %s\r\n' % header for header in RESPONSE_HEADERS).encode('latin-1')
 
 # Global variables
-stored_api_key = None  # Store the Base64 encoded version
-request_counts = {}
+stored_api_key = None  # (salt, HMAC-SHA256 of the key under that salt); the key itself is never stored
+request_counts = OrderedDict()  # client IP -> (tokens, last refill time)
+_rate_limit_lock = threading.Lock()  # requests are served on concurrent threads
 
-# Initialize JSON files if they don't exist
-def init_json_files():
-    for file in [TRANSACTIONS_FILE, LOGS_FILE]:
-        try:
-            with open(file, 'r') as f:
-                json.load(f)
-        except FileNotFoundError:
-            with open(file, 'w') as f:
-                json.dump([], f)
+# In-memory copy of the transactions file, loaded once by init_json_files
+_transactions = []
+_log_file = None  # buffered append handle on LOGS_FILE, opened by init_json_files
+_tx_index = {}  # id -> position in _transactions, kept in step with every change
+_deleted = set()  # positions of deleted transactions, skipped until the list is compacted
+_next_id = 1  # id for the next POST; only ever grows, so deleted ids are not reused
+_ids_ascending = True  # every id an int, in ascending order: pages can binary search (see page_start)
+_next_log_seq = 1  # sequence number for the next logId
+_list_body = None  # Encoded first GET /transactions page, dropped on every mutation
+_store_lock = threading.RLock()  # held around every read or change of the state above
+_dirty_files = set()  # files whose in-memory state or buffer is ahead of disk
+_dirty = threading.Event()  # wakes the background writer
+_flush_lock = threading.Lock()  # one flush at a time, so an older snapshot never lands last
+_writer = None
 
-init_json_files()
+# Initialize JSON files if they don't exist and load the transactions into memory
+def init_json_files():
+    global _transactions, _log_file, _tx_index, _deleted, _list_body, _next_id, _next_log_seq, _ids_ascending
+    try:
+        _transactions = JSONHandler.read_json(TRANSACTIONS_FILE)
+    except FileNotFoundError:
+        with open(TRANSACTIONS_FILE, 'w') as f:
+            json.dump([], f)
+        _transactions = []
+    if not os.path.exists(LOGS_FILE) and os.path.exists(LEGACY_LOGS_FILE):
+        with open(LOGS_FILE, 'wb') as f:
+            f.writelines(json_dumps(entry) + b'\n' for entry in JSONHandler.read_json(LEGACY_LOGS_FILE))
+    try:
+        with open(LOGS_FILE, 'rb') as f:
+            log_count = sum(1 for _ in f)
+    except FileNotFoundError:
+        log_count = 0
+    if _log_file is not None:
+        _log_file.close()
+    _log_file = open(LOGS_FILE, 'ab', buffering=LOG_BUFFER_SIZE)
+    _tx_index = JSONHandler.build_index(_transactions)
+    _deleted = set()
+    _list_body = None
+    _next_id = JSONHandler.get_next_id(_transactions)  # the one full scan, at startup
+    # POST appends ids above every int id and compaction keeps the order, so this holds until the next load
+    _ids_ascending = JSONHandler.ids_ascending(_transactions)
+    _next_log_seq = log_count + 1
 
 def setup_api_key():
-    """Get plain API key from user, encode it, and store the Base64 version"""
+    """Get plain API key from user and store a salted HMAC-SHA256 digest of it"""
     global stored_api_key
     
     try:
-        # Try to load existing API key (Base64 encoded)
+        # Try to load existing API key ("salt:digest", both Base64 encoded)
         with open(API_KEY_FILE, 'r') as f:
-            stored_api_key = f.read().strip()
+            saved = f.read().strip()
+        if ':' in saved:
+            salt, digest = saved.split(':', 1)
+            stored_api_key = (base64.b64decode(salt), base64.b64decode(digest))
+        else:
+            # Key file from before hashing: plain Base64 of the key, so replace it with a digest
+            stored_api_key = Security.protect_key(base64.b64decode(saved).decode())
+            Security.save_key()
+        Security.verify.cache_clear()
         print("Loaded existing API key")
         return
     except FileNotFoundError:
@@ -48,12 +134,10 @@ def setup_api_key():
     while True:
         user_key = getpass.getpass("Your API key: ").strip()
         if user_key:
-            # Encode to Base64 and store the encoded version
-            stored_api_key = base64.b64encode(user_key.encode()).decode()
-            
-            # Save the Base64 encoded version for future runs
-            with open(API_KEY_FILE, 'w') as f:
-                f.write(stored_api_key)
+            # Keep only a salted digest, and save it for future runs
+            stored_api_key = Security.protect_key(user_key)
+            Security.verify.cache_clear()
+            Security.save_key()
             
             print("API key saved successfully!")
             break
@@ -61,232 +145,493 @@ def setup_api_key():
             print("API key cannot be empty. Try again.")
 
 class Security:
+    @staticmethod
+    def hash_key(salt, key_plain):
+        return hmac.new(salt, key_plain.encode(), 'sha256').digest()
+    
+    @staticmethod
+    def protect_key(key_plain):
+        """(salt, digest) pair for a plain key, with a fresh random salt"""
+        salt = secrets.token_bytes(16)
+        return salt, Security.hash_key(salt, key_plain)
+    
+    @staticmethod
+    def save_key():
+        salt, digest = stored_api_key
+        with open(API_KEY_FILE, 'w') as f:
+            f.write(base64.b64encode(salt).decode() + ':' + base64.b64encode(digest).decode())
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def verify(incoming_key_plain):
+        """Verdict per plain key, memoized so repeat clients skip the hashing; cleared when the key changes"""
+        salt, digest = stored_api_key
+        # Compare raw digests in constant time
+        return hmac.compare_digest(Security.hash_key(salt, incoming_key_plain), digest)
+    
     @staticmethod
     def authenticate(incoming_key_plain):
-        """Encode the incoming plain key and compare with stored Base64 version"""
-        global stored_api_key
+        """Hash the incoming plain key and compare with the stored digest"""
         try:
-            # Encode the incoming plain key to Base64
-            incoming_encoded = base64.b64encode(incoming_key_plain.encode()).decode()
-            
-            # Compare with our stored Base64 key
-            return stored_api_key == incoming_encoded
+            return Security.verify(incoming_key_plain)
         except:
             return False
     
     @staticmethod
     def rate_limit(client_ip):
-        """Simple IP-based rate limiting"""
-        current_minute = datetime.now().minute
-        
-        if client_ip not in request_counts:
-            request_counts[client_ip] = {"minute": current_minute, "count": 1}
-            return True
+        """IP-based token bucket: RATE_LIMIT tokens, refilled smoothly over each minute.
+        Returns (allowed, seconds until the next token when refused)"""
+        refill_rate = RATE_LIMIT / 60.0
+        now = time.monotonic()
         
-        if request_counts[client_ip]["minute"] != current_minute:
-            request_counts[client_ip] = {"minute": current_minute, "count": 1}
-            return True
+        with _rate_limit_lock:
+            tokens, last_refill = request_counts.get(client_ip, (RATE_LIMIT, now))
+            tokens = min(RATE_LIMIT, tokens + (now - last_refill) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            request_counts[client_ip] = (tokens, now)
+            request_counts.move_to_end(client_ip)
+            if len(request_counts) > MAX_TRACKED_CLIENTS:
+                request_counts.popitem(last=False)
         
-        request_counts[client_ip]["count"] += 1
-        return request_counts[client_ip]["count"] <= RATE_LIMIT
+        return allowed, 0.0 if allowed else (1 - tokens) / refill_rate
 
 class JSONHandler:
     @staticmethod
     def read_json(file_path):
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        # One binary read and a parse of the bytes, skipping the text-decoding layer
+        with open(file_path, 'rb') as f:
+            return json_loads(f.read())
 
     @staticmethod
     def write_json(file_path, data):
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Encode once and write the bytes in a single call, then swap the file in atomically
+        # so a crash mid-write never leaves a truncated JSON file behind
+        payload = json_dumps(data)
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+
+    @staticmethod
+    def mark_dirty(file_path):
+        """Schedule file_path to be rewritten by the background writer (call with _store_lock held)"""
+        global _writer
+        _dirty_files.add(file_path)
+        _dirty.set()
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=JSONHandler._flush_worker, name='json-writer', daemon=True)
+            _writer.start()
+
+    @staticmethod
+    def _flush_worker():
+        while True:
+            _dirty.wait()
+            time.sleep(FLUSH_DELAY)  # let the rest of a burst land before writing
+            try:
+                JSONHandler.flush()
+            except Exception as e:
+                # flush() marked the files dirty again, so keep the thread alive and retry them
+                print(f"Background write failed, retrying in {FLUSH_RETRY_DELAY}s: {e}")
+                time.sleep(FLUSH_RETRY_DELAY)
+
+    @staticmethod
+    def flush():
+        """Write every dirty file now; the transactions are snapshotted under the lock, written outside it"""
+        with _flush_lock:
+            with _store_lock:
+                _dirty.clear()
+                # A shallow copy is enough: records are replaced, never mutated in place
+                snapshot = JSONHandler.live_transactions() if TRANSACTIONS_FILE in _dirty_files else None
+                logs_dirty = LOGS_FILE in _dirty_files
+                pending = set(_dirty_files)
+                _dirty_files.clear()
+            try:
+                if snapshot is not None:
+                    JSONHandler.write_json(TRANSACTIONS_FILE, snapshot)
+                if logs_dirty:
+                    _log_file.flush()  # the buffered writer has its own lock
+            except Exception:
+                # Nothing may be lost: put the files back so the next flush writes them again
+                with _store_lock:
+                    _dirty_files.update(pending)
+                    _dirty.set()
+                raise
+
+    @staticmethod
+    def append_log(entry):
+        """Add one line to the log buffer (call with _store_lock held); the writer flushes it"""
+        _log_file.write(json_dumps(entry) + b'\n')
+        JSONHandler.mark_dirty(LOGS_FILE)
+
+    @staticmethod
+    def live_transactions():
+        """Copy of the transactions without the deleted ones (call with _store_lock held)"""
+        if not _deleted:
+            return list(_transactions)
+        return [item for i, item in enumerate(_transactions) if i not in _deleted]
+
+    @staticmethod
+    def save_transactions():
+        """Drop the cached first page and schedule the transactions for disk; _tx_index is kept by the caller"""
+        global _list_body
+        _list_body = None
+        JSONHandler.mark_dirty(TRANSACTIONS_FILE)
+
+    @staticmethod
+    def delete_transaction(position):
+        """Tombstone the transaction at position; compact once half the list is tombstones"""
+        global _tx_index
+        _deleted.add(position)
+        # The index points at the first live row per id; another live row with the same id
+        # (a hand-edited file) takes over, so it stays reachable by id
+        item_id = _transactions[position].get('id')
+        replacement = JSONHandler.next_live_position(item_id, position)
+        if replacement is not None:
+            _tx_index[item_id] = replacement
+        if len(_deleted) * 2 >= len(_transactions):
+            # Compact in place: one O(n) pass amortised over the deletes since the last one
+            _transactions[:] = JSONHandler.live_transactions()
+            _deleted.clear()
+            _tx_index = JSONHandler.build_index(_transactions)
+        JSONHandler.save_transactions()
+
+    @staticmethod
+    def next_live_position(item_id, position):
+        """Position of the next live row after position with id item_id, or None"""
+        for later in range(position + 1, len(_transactions)):
+            if _transactions[later].get('id') == item_id:
+                if later not in _deleted:
+                    return later
+            elif _ids_ascending:
+                return None  # equal ids sit next to each other, so there are no more
+        return None
+
+    @staticmethod
+    def page_start(after_id):
+        """Position of the first transaction with an id above after_id (only while _ids_ascending)"""
+        if after_id <= 0:
+            return 0
+        position = _tx_index.get(after_id)
+        if position is not None:
+            # Rows sharing after_id (a hand-edited file) follow it, and are not "above" it either
+            position += 1
+            while position < len(_transactions) and _transactions[position].get('id') == after_id:
+                position += 1
+            return position
+        # after_id was deleted or never existed: binary search the ascending ids
+        low, high = 0, len(_transactions)
+        while low < high:
+            mid = (low + high) // 2
+            # Tombstoned rows keep their id, so the search still sees ascending ids
+            if (_transactions[mid].get('id') or 0) <= after_id:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    @staticmethod
+    def encoded_page(after_id=0, limit=PAGE_SIZE):
+        """GET /transactions body for one page; the default first page is encoded once per change"""
+        global _list_body
+        is_default = after_id == 0 and limit == PAGE_SIZE
+        if is_default and _list_body is not None:
+            return _list_body
+        if not _ids_ascending:
+            # Hand-edited or imported file with out-of-order or non-int ids: filter the whole store
+            # and sort what is left; rows without an int id cannot be paged by after_id, so are skipped
+            page = heapq.nsmallest(limit, (
+                item for position, item in enumerate(_transactions)
+                if position not in _deleted and type(item.get('id')) is int and item['id'] > after_id
+            ), key=itemgetter('id'))
+        else:
+            start = JSONHandler.page_start(after_id)
+            if _deleted:
+                page = []
+                for position in range(start, len(_transactions)):
+                    if position not in _deleted:
+                        page.append(_transactions[position])
+                        if len(page) == limit:
+                            break
+            else:
+                page = _transactions[start:start + limit]
+        body = json_dumps(page)
+        if is_default:
+            _list_body = body
+        return body
 
     @staticmethod
-    def find_by_id(data_list, item_id):
-        return next((item for item in data_list if item.get('TransactionId') == item_id), None)
+    def build_index(data_list):
+        # First occurrence wins, matching the scan this replaces
+        index = {}
+        for i, item in enumerate(data_list):
+            index.setdefault(item.get('id'), i)
+        return index
+
+    @staticmethod
+    def find_by_id(data_list, item_id, index=None):
+        if index is None:
+            index = JSONHandler.build_index(data_list)
+        position = index.get(item_id)
+        return data_list[position] if position is not None else None
 
     @staticmethod
     def get_next_id(data_list):
-        if not data_list:
-            return 1
-        return max(item.get('TransactionId', 0) for item in data_list) + 1
+        # Only int ids count, so a str id in a hand-edited file cannot stop the server from starting
+        return max((item['id'] for item in data_list if type(item.get('id')) is int), default=0) + 1
+
+    @staticmethod
+    def ids_ascending(data_list):
+        """True when every id is an int and no id is below the one before it"""
+        previous = None
+        for item in data_list:
+            item_id = item.get('id')
+            if type(item_id) is not int or (previous is not None and item_id < previous):
+                return False
+            previous = item_id
+        return True
+
+init_json_files()
+atexit.register(JSONHandler.flush)  # don't lose the last FLUSH_DELAY of writes on exit
 
 class APIHandler(http.server.BaseHTTPRequestHandler):
+    # Keep-alive: clients reuse one connection instead of reconnecting for every request.
+    # Every response carries Content-Length, which is what keeps the framing intact
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    
+    def parse_request(self):
+        self._body_read = False  # the handler lives for the whole connection, so reset per request
+        if not super().parse_request():
+            return False
+        if 'Transfer-Encoding' in self.headers:
+            # Bodies are only read by Content-Length: a chunked body left on the socket would be
+            # parsed as the next request, so refuse it (_write_response closes the connection)
+            self._send_error(411, "Content-Length required")
+            return False
+        return True
     
     def _security_check(self):
         """Security gateway for all requests"""
         api_key_plain = self.headers.get('X-API-Key')  # User sends plain text
         client_ip = self.client_address[0]
         
-        # Authentication - user sends plain text, we encode and compare with stored Base64
+        # Authentication - user sends plain text, we hash it and compare with the stored digest
         if not api_key_plain or not Security.authenticate(api_key_plain):
             self._send_error(401, "Invalid API key")
             return False
         
         # Rate limiting
-        if not Security.rate_limit(client_ip):
-            self._send_error(429, "Rate limit exceeded")
+        allowed, retry_after = Security.rate_limit(client_ip)
+        if not allowed:
+            self._send_error(429, "Rate limit exceeded",
+                             b'Retry-After: %d\r\n' % math.ceil(retry_after))
             return False
         
         return True
     
-    def _set_headers(self, status_code=200):
-        self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-API-Key')
-        self.end_headers()
+    def _write_response(self, status_code=200, body=b'', extra_headers=b''):
+        """Send status line, headers and body with a single write instead of one per part"""
+        self.log_request(status_code)
+        if 'Transfer-Encoding' in self.headers or (
+                not self._body_read and self.headers.get('Content-Length', '0') != '0'):
+            # Body unread (e.g. 401) or not framed by Content-Length: its bytes would be parsed as the next request
+            self.close_connection = True
+            extra_headers += b'Connection: close\r\n'
+        status_line = '%s %d %s\r\nServer: %s\r\nDate: %s\r\n' % (
+            self.protocol_version, status_code, self.responses[status_code][0],
+            self.version_string(), self.date_time_string())
+        self.wfile.write(b''.join((
+            status_line.encode('latin-1'),
+            RESPONSE_HEADER_BLOCK,
+            extra_headers,
+            b'Content-Length: %d\r\n\r\n' % len(body),
+            body,
+        )))
     
     def do_OPTIONS(self):
-        self._set_headers(200)
+        self._write_response(200)
     
     def _parse_path(self):
-        parsed_path = urlparse(self.path)
-        path_parts = parsed_path.path.strip('/').split('/')
-        query_params = parse_qs(parsed_path.query)
+        target = self.path
+        if not target.startswith('/'):
+            # Absolute-form target (GET http://host/transactions HTTP/1.1): reduce it to path and query
+            parts = urlsplit(target)
+            target = '/' + parts.path.lstrip('/') + ('?' + parts.query if parts.query else '')
+        match = PATH_PATTERN.match(target)
+        if not match:
+            return [], {}
+        endpoint, item_id, query = match.groups()
+        path_parts = [endpoint, item_id] if item_id else [endpoint]
+        query_params = parse_qs(query) if query else {}
         return path_parts, query_params
     
     def _read_body(self):
         content_length = int(self.headers.get('Content-Length', 0))
+        self._body_read = True
         return self.rfile.read(content_length).decode('utf-8')
     
-    def _send_error(self, status_code, message):
-        self._set_headers(status_code)
+    def _send_error(self, status_code, message, extra_headers=b''):
         response = {'detail': message}
-        self.wfile.write(json.dumps(response).encode('utf-8'))
+        self._write_response(status_code, json_dumps(response), extra_headers)
     
     def _send_json(self, data, status_code=200):
-        self._set_headers(status_code)
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self._send_body(json_dumps(data), status_code)
     
-    # Transactions endpoints - ORIGINAL LOGIC PRESERVED
-    def handle_transactions(self, path_parts, method):
-        if method == 'GET':
-            if len(path_parts) > 1:
-                # GET /transactions/{transaction_id}
-                try:
-                    transaction_id = int(path_parts[1])
-                    transactions = JSONHandler.read_json(TRANSACTIONS_FILE)
-                    transaction = JSONHandler.find_by_id(transactions, transaction_id)
-                    if transaction:
-                        self._send_json(transaction)
-                    else:
-                        self._send_error(404, "Transaction not found")
-                except ValueError:
-                    self._send_error(400, "Invalid transaction ID")
-            else:
-                # GET /transactions
-                transactions = JSONHandler.read_json(TRANSACTIONS_FILE)
-                self._send_json(transactions)
+    def _send_body(self, body, status_code=200):
+        self._write_response(status_code, body)
+    
+    # Transactions endpoints - one method per (method, path shape), see _ROUTES
+    def _get_txns_list(self, path_parts, query_params):
+        # GET /transactions?after_id={id}&limit={n}
+        query_params = query_params or {}
+        try:
+            after_id = int(query_params.get('after_id', ['0'])[0])
+            limit = int(query_params.get('limit', [str(PAGE_SIZE)])[0])
+        except ValueError:
+            self._send_error(400, "Invalid pagination parameters")
+            return
+        if after_id < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+            self._send_error(400, "Invalid pagination parameters")
+            return
+        with _store_lock:
+            body = JSONHandler.encoded_page(after_id, limit)
+        self._send_body(body)
+    
+    def _get_txn_by_id(self, path_parts, query_params):
+        # GET /transactions/{transaction_id}
+        try:
+            transaction_id = int(path_parts[1])
+        except ValueError:
+            self._send_error(400, "Invalid transaction ID")
+            return
+        with _store_lock:
+            transaction = JSONHandler.find_by_id(_transactions, transaction_id, _tx_index)
+        if transaction:
+            self._send_json(transaction)
+        else:
+            self._send_error(404, "Transaction not found")
+    
+    def _post_txn(self, path_parts, query_params):
+        # POST /transactions
+        try:
+            transaction_data = json_loads(self._read_body())
+        except json.JSONDecodeError:
+            self._send_error(400, "Invalid JSON")
+            return
         
-        elif method == 'POST':
-            # POST /transactions
-            try:
-                body = self._read_body()
-                transaction_data = json.loads(body)
-                
-                # Validate required fields
-                required_fields = ['type', 'amount', 'sender', 'receiver', 'timestamp']
-                for field in required_fields:
-                    if field not in transaction_data:
-                        self._send_error(400, f"Missing required field: {field}")
-                        return
-                
-                transactions = JSONHandler.read_json(TRANSACTIONS_FILE)
-                new_transaction = {
-                        'id': JSONHandler.get_next_id(transactions),
-                        'type': transaction_data['type'],
-                        'amount': transaction_data['amount'],
-                        'sender': transaction_data['sender'],
-                        'receiver': transaction_data['receiver'],
-                        'timestamp': transaction_data['timestamp']
-                    }
-                
-                transactions.append(new_transaction)
-                JSONHandler.write_json(TRANSACTIONS_FILE, transactions)
-                
-                # Create system log
-                logs = JSONHandler.read_json(LOGS_FILE)
-                new_log = {
-                    'logId': f"LOG-{new_transaction['TransactionId']:03d}",
-                    'status': "TRANSACTION_CREATED",
-                    'transactionId': new_transaction['TransactionId'],
-                    'timestamp': datetime.now().isoformat()
+        # Validate required fields
+        for field in REQUIRED_FIELDS:
+            if field not in transaction_data:
+                self._send_error(400, f"Missing required field: {field}")
+                return
+        
+        global _next_id, _next_log_seq
+        with _store_lock:
+            new_transaction = {
+                    'id': _next_id,
+                    'type': transaction_data['type'],
+                    'amount': transaction_data['amount'],
+                    'sender': transaction_data['sender'],
+                    'receiver': transaction_data['receiver'],
+                    'timestamp': transaction_data['timestamp']
                 }
-                logs.append(new_log)
-                JSONHandler.write_json(LOGS_FILE, logs)
-                
-                self._send_json(new_transaction, 201)
-            except json.JSONDecodeError:
-                self._send_error(400, "Invalid JSON")
+            
+            _next_id += 1
+            _transactions.append(new_transaction)
+            _tx_index.setdefault(new_transaction['id'], len(_transactions) - 1)
+            JSONHandler.save_transactions()
+            
+            # Create system log
+            new_log = {
+                'logId': "LOG-%03d" % _next_log_seq,
+                'status': "TRANSACTION_CREATED",
+                'transactionId': new_transaction['id'],
+                'timestamp': datetime.now().isoformat()
+            }
+            _next_log_seq += 1
+            JSONHandler.append_log(new_log)
         
-        elif method == 'PUT':
-            # PUT /transactions/{transaction_id}
-            if len(path_parts) > 1:
-                try:
-                    transaction_id = int(path_parts[1])
-                    body = self._read_body()
-                    transaction_data = json.loads(body)
-                    
-                    transactions = JSONHandler.read_json(TRANSACTIONS_FILE)
-                    transaction_index = next((i for i, t in enumerate(transactions) if t.get('TransactionId') == transaction_id), None)
-                    
-                    if transaction_index is None:
-                        self._send_error(404, "Transaction not found")
-                        return
-                    
-                    # Update transaction
-                    updated_transaction = {
-                        'id': transaction_id,
-                        'type': transaction_data['type'],
-                        'amount': transaction_data['amount'],
-                        'sender': transaction_data['sender'],
-                        'receiver': transaction_data['receiver'],
-                        'timestamp': transaction_data['timestamp']
-                    }
-                    
-                    transactions[transaction_index] = updated_transaction
-                    JSONHandler.write_json(TRANSACTIONS_FILE, transactions)
-                    self._send_json(updated_transaction)
-                except (ValueError, json.JSONDecodeError):
-                    self._send_error(400, "Invalid data")
+        self._send_json(new_transaction, 201)
+    
+    def _put_txn(self, path_parts, query_params):
+        # PUT /transactions/{transaction_id}
+        try:
+            transaction_id = int(path_parts[1])
+            transaction_data = json_loads(self._read_body())
+        except (ValueError, json.JSONDecodeError):
+            self._send_error(400, "Invalid data")
+            return
         
-        elif method == 'DELETE':
-            # DELETE /transactions/{transaction_id}
-            if len(path_parts) > 1:
-                try:
-                    transaction_id = int(path_parts[1])
-                    transactions = JSONHandler.read_json(TRANSACTIONS_FILE)
-                    transaction_index = next((i for i, t in enumerate(transactions) if t.get('TransactionId') == transaction_id), None)
-                    
-                    if transaction_index is None:
-                        self._send_error(404, "Transaction not found")
-                        return
-                    
-                    del transactions[transaction_index]
-                    JSONHandler.write_json(TRANSACTIONS_FILE, transactions)
-                    self._send_json({'detail': 'Transaction deleted successfully'})
-                except ValueError:
-                    self._send_error(400, "Invalid transaction ID")
+        # Update transaction
+        updated_transaction = {
+            'id': transaction_id,
+            'type': transaction_data['type'],
+            'amount': transaction_data['amount'],
+            'sender': transaction_data['sender'],
+            'receiver': transaction_data['receiver'],
+            'timestamp': transaction_data['timestamp']
+        }
+        
+        with _store_lock:
+            transaction_index = _tx_index.get(transaction_id)
+            if transaction_index is not None:
+                _transactions[transaction_index] = updated_transaction
+                JSONHandler.save_transactions()
+        
+        if transaction_index is None:
+            self._send_error(404, "Transaction not found")
+            return
+        self._send_json(updated_transaction)
+    
+    def _delete_txn(self, path_parts, query_params):
+        # DELETE /transactions/{transaction_id}
+        try:
+            transaction_id = int(path_parts[1])
+        except ValueError:
+            self._send_error(400, "Invalid transaction ID")
+            return
+        
+        with _store_lock:
+            transaction_index = _tx_index.pop(transaction_id, None)
+            if transaction_index is not None:
+                JSONHandler.delete_transaction(transaction_index)
+        
+        if transaction_index is None:
+            self._send_error(404, "Transaction not found")
+            return
+        self._send_json({'detail': 'Transaction deleted successfully'})
+    
+    # (endpoint, method, has id segment) -> handler. Built once with the class:
+    # a handler instance is created per request, so building it in __init__ would not help
+    _ROUTES = {
+        ('transactions', 'GET', False): _get_txns_list,
+        ('transactions', 'GET', True): _get_txn_by_id,
+        ('transactions', 'POST', False): _post_txn,
+        ('transactions', 'PUT', True): _put_txn,
+        ('transactions', 'DELETE', True): _delete_txn,
+    }
     
     def do_GET(self):
         path_parts, query_params = self._parse_path()
-        self._route_request(path_parts, 'GET')
+        self._route_request(path_parts, 'GET', query_params)
     
     def do_POST(self):
         path_parts, query_params = self._parse_path()
-        self._route_request(path_parts, 'POST')
+        self._route_request(path_parts, 'POST', query_params)
     
     def do_PUT(self):
         path_parts, query_params = self._parse_path()
-        self._route_request(path_parts, 'PUT')
+        self._route_request(path_parts, 'PUT', query_params)
     
     def do_DELETE(self):
         path_parts, query_params = self._parse_path()
-        self._route_request(path_parts, 'DELETE')
+        self._route_request(path_parts, 'DELETE', query_params)
     
-    def _route_request(self, path_parts, method):
+    def _route_request(self, path_parts, method, query_params=None):
         try:
             if not path_parts:
                 self._send_error(404, "Endpoint not found")
@@ -296,23 +641,23 @@ class APIHandler(http.server.BaseHTTPRequestHandler):
             if not self._security_check():
                 return
             
-            endpoint = path_parts[0]
-            
-            if endpoint == 'transactions':
-                self.handle_transactions(path_parts, method)
+            handler = self._ROUTES.get((path_parts[0], method, len(path_parts) > 1))
+            if handler:
+                handler(self, path_parts, query_params)
             else:
                 self._send_error(404, "Endpoint not found")
         except Exception as e:
             self._send_error(500, f"Internal server error: {str(e)}")
 
+class APIServer(http.server.ThreadingHTTPServer):
+    request_queue_size = LISTEN_BACKLOG
+
 def run_server(port=8000):
     # Setup API key first
     setup_api_key()
     
-    # Decode to show user what their plain text key is
-    plain_key = base64.b64decode(stored_api_key).decode()
-    
-    with socketserver.TCPServer(("", port), APIHandler) as httpd:
+    # One thread per connection (daemon threads, so Ctrl+C exits cleanly)
+    with APIServer(("", port), APIHandler) as httpd:
         print(f"\nServer running on port {port}")
         print(f"Rate limit: {RATE_LIMIT} requests/minute per IP")
         print(f"Security: API Key authentication enabled")
@@ -322,10 +667,9 @@ def run_server(port=8000):
         print(f"  POST   /transactions")
         print(f"  PUT    /transactions/{{id}}")
         print(f"  DELETE /transactions/{{id}}")
-        print(f"\nRequired header for all requests:")
-        print(f"\nYour plain text API key: {plain_key}")
+        print(f"\nRequired header for all requests: X-API-Key (the key you set up)")
         print(f"\nExample curl command:")
-        print(f'curl -H "X-API-Key: {plain_key}" http://localhost:{port}/transactions')
+        print(f'curl -H "X-API-Key: your_plain_text_key" http://localhost:{port}/transactions')
         httpd.serve_forever()
 
 if __name__ == "__main__":
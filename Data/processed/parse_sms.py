@@ -1,6 +1,11 @@
 import xml.etree.ElementTree as ET
 import json
 
+try:
+    import orjson  # optional, faster JSON output
+except ImportError:
+    orjson = None
+
 # Path to your XML file
 xml_file = "modified_sms_v2.xml"  # Make sure this file is in the same folder
 
@@ -8,19 +13,28 @@ def parse_xml_to_list(path):
     """
     Parse the XML file and convert each <sms> record into a dictionary.
     Returns a list of dictionaries.
+    The file is streamed, so only one <sms> record is held as XML at a time.
     """
-    tree = ET.parse(path)
-    root = tree.getroot()
     transactions = []
+    events = ET.iterparse(path, events=("start", "end"))
+    _, root = next(events)
+    depth = 0  # only direct children of the root are records, as with root.findall("sms")
 
-    for sms in root.findall("sms"):
-        record = {}
-        for child in sms:
-            record[child.tag] = child.text  # Each XML tag becomes a key
+    for event, elem in events:
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 0 or elem.tag != "sms":
+            continue
+        record = {child.tag: child.text for child in elem}  # Each XML tag becomes a key
         # Convert id to integer for easier handling
         if "id" in record:
             record["id"] = int(record["id"])
         transactions.append(record)
+        # Free the parsed record, and drop it from the root so finished records don't pile up
+        elem.clear()
+        root.remove(elem)
 
     return transactions
 
@@ -29,4 +43,7 @@ if __name__ == "__main__":
     transactions = parse_xml_to_list(xml_file)
 
     # Print transactions as JSON (pretty)
-    print(json.dumps(transactions, indent=2))
\ No newline at end of file
+    if orjson:
+        print(orjson.dumps(transactions, option=orjson.OPT_INDENT_2).decode('utf-8'))
+    else:
+        print(json.dumps(transactions, indent=2))
\ No newline at end of file
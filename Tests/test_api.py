@@ -0,0 +1,449 @@
+import unittest
+import base64
+import errno
+import http.client
+import io
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest import mock
+
+# Run from the repository root: python -m unittest Tests.test_api
+# API.app loads and writes its JSON files in the working directory as soon as it is imported,
+# so setUpModule imports it from inside a scratch directory
+app = None
+API_KEY = 'test-key'
+_workdir = None
+_previous_cwd = None
+_server = None
+
+
+def setUpModule():
+    global app, _workdir, _previous_cwd, _server
+    _previous_cwd = os.getcwd()
+    _workdir = tempfile.TemporaryDirectory()
+    os.chdir(_workdir.name)
+    from API import app
+    app.stored_api_key = app.Security.protect_key(API_KEY)
+    app.Security.verify.cache_clear()
+
+    class QuietHandler(app.APIHandler):
+        def log_message(self, format, *args):
+            pass  # keep the test report readable
+
+    _server = app.APIServer(('127.0.0.1', 0), QuietHandler)
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+
+
+def tearDownModule():
+    _server.shutdown()
+    _server.server_close()
+    app.JSONHandler.flush()
+    app._log_file.close()
+    os.chdir(_previous_cwd)
+    _workdir.cleanup()
+
+
+def reset_store():
+    """Empty transactions file and freshly loaded in-memory state"""
+    app.JSONHandler.flush()  # nothing pending may land on top of the reset
+    app.JSONHandler.write_json(app.TRANSACTIONS_FILE, [])
+    app.init_json_files()
+
+
+def request(method, path, body=None):
+    """(status, decoded body) of one authenticated request to the test server, on a new connection"""
+    conn = http.client.HTTPConnection('127.0.0.1', _server.server_address[1], timeout=5)
+    try:
+        conn.request(method, path, body, {'X-API-Key': API_KEY})
+        response = conn.getresponse()
+        return response.status, app.json_loads(response.read())
+    finally:
+        conn.close()
+
+
+def raw_exchange(data):
+    """Everything the server sends back for the raw request bytes, until it closes the connection"""
+    with socket.create_connection(('127.0.0.1', _server.server_address[1]), timeout=5) as sock:
+        sock.sendall(data)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+
+def transaction_body(**fields):
+    """JSON body with every field POST and PUT require"""
+    data = {'type': 'payment', 'amount': 5000, 'sender': '25078100001',
+            'receiver': '25078200001', 'timestamp': '2024-06-28T14:30:00'}
+    data.update(fields)
+    return app.json_dumps(data)
+
+
+class TestConnectionFraming(unittest.TestCase):
+    """Keep-alive connections must never run request bytes the handler did not frame itself"""
+
+    def setUp(self):
+        reset_store()
+
+    def test_chunked_body_is_not_run_as_a_request(self):
+        """A chunked body that holds a second request gets one 411 and a closed connection"""
+        status, created = request('POST', '/transactions', transaction_body())
+        self.assertEqual(status, 201)
+
+        smuggled = ('DELETE /transactions/%d HTTP/1.1\r\nHost: x\r\nX-API-Key: %s\r\n'
+                    'Content-Length: 0\r\n\r\n' % (created['id'], API_KEY)).encode()
+        reply = raw_exchange(
+            b'POST /transactions HTTP/1.1\r\nHost: x\r\nX-API-Key: ' + API_KEY.encode() +
+            b'\r\nTransfer-Encoding: chunked\r\n\r\n' + smuggled)
+
+        self.assertTrue(reply.startswith(b'HTTP/1.1 411 '))
+        self.assertEqual(reply.count(b'HTTP/1.1 '), 1)
+        self.assertIn(b'Connection: close\r\n', reply)
+        # The DELETE inside the body never ran
+        self.assertEqual(request('GET', '/transactions/%d' % created['id']), (200, created))
+
+    def test_keep_alive_serves_several_requests(self):
+        """Without a body to skip, one connection carries request after request"""
+        conn = http.client.HTTPConnection('127.0.0.1', _server.server_address[1], timeout=5)
+        try:
+            for _ in range(3):
+                conn.request('GET', '/transactions', headers={'X-API-Key': API_KEY})
+                response = conn.getresponse()
+                self.assertEqual((response.status, response.read()), (200, b'[]'))
+        finally:
+            conn.close()
+
+
+class TestRequestTarget(unittest.TestCase):
+    """Request paths are routed the same whichever form of request target the client sends"""
+
+    def setUp(self):
+        reset_store()
+
+    def raw_get(self, target):
+        """(status line, decoded body) of a GET for target, sent as is over a raw socket"""
+        reply = raw_exchange(('GET %s HTTP/1.1\r\nHost: x\r\nX-API-Key: %s\r\nConnection: close\r\n\r\n'
+                              % (target, API_KEY)).encode())
+        head, _, body = reply.partition(b'\r\n\r\n')
+        return head.split(b'\r\n', 1)[0], app.json_loads(body)
+
+    def test_absolute_form_target(self):
+        """GET http://host/... reaches the same handlers as GET /..."""
+        created = request('POST', '/transactions', transaction_body())[1]
+        base = 'http://127.0.0.1:%d' % _server.server_address[1]
+        for target, expected in (('%s/transactions/%d' % (base, created['id']), created),
+                                 (base + '/transactions?after_id=0&limit=1', [created]),
+                                 (base + '/transactions?after_id=%d' % created['id'], [])):
+            with self.subTest(target=target):
+                self.assertEqual(self.raw_get(target), (b'HTTP/1.1 200 OK', expected))
+        self.assertEqual(self.raw_get(base + '/unknown')[0], b'HTTP/1.1 404 Not Found')
+
+
+class TestRateLimit(unittest.TestCase):
+    """Per-IP token bucket: refill, the 429 response and the bound on tracked clients"""
+
+    def setUp(self):
+        self.clear_buckets()
+        self.addCleanup(self.clear_buckets)  # every other test starts with a full bucket for 127.0.0.1
+        self.now = 1000.0
+        clock = mock.patch.object(app.time, 'monotonic', side_effect=lambda: self.now)
+        self.start_clock, self.stop_clock = clock.start, clock.stop
+
+    @staticmethod
+    def clear_buckets():
+        with app._rate_limit_lock:
+            app.request_counts.clear()
+
+    def test_bucket_refills(self):
+        """RATE_LIMIT requests pass at once, then one more per 60 / RATE_LIMIT seconds"""
+        with mock.patch.object(app, 'RATE_LIMIT', 3):
+            self.start_clock()
+            self.addCleanup(self.stop_clock)
+            for _ in range(3):
+                self.assertEqual(app.Security.rate_limit('10.0.0.1'), (True, 0.0))
+            allowed, retry_after = app.Security.rate_limit('10.0.0.1')
+            self.assertFalse(allowed)
+            self.assertAlmostEqual(retry_after, 20.0)
+            # Half a token after 10 seconds, a whole one after 20
+            self.now += 10
+            allowed, retry_after = app.Security.rate_limit('10.0.0.1')
+            self.assertFalse(allowed)
+            self.assertAlmostEqual(retry_after, 10.0)
+            self.now += 10
+            self.assertEqual(app.Security.rate_limit('10.0.0.1'), (True, 0.0))
+            self.assertFalse(app.Security.rate_limit('10.0.0.1')[0])
+            # Another client has its own bucket
+            self.assertTrue(app.Security.rate_limit('10.0.0.2')[0])
+            # A long idle spell refills no more than RATE_LIMIT tokens
+            self.now += 3600
+            self.assertEqual([app.Security.rate_limit('10.0.0.1')[0] for _ in range(4)],
+                             [True, True, True, False])
+
+    def test_refused_request_gets_429_with_retry_after(self):
+        """Past the limit the server answers 429 and says how many seconds to wait"""
+        with mock.patch.object(app, 'RATE_LIMIT', 2):
+            for _ in range(2):
+                self.assertEqual(request('GET', '/transactions')[0], 200)
+            conn = http.client.HTTPConnection('127.0.0.1', _server.server_address[1], timeout=5)
+            try:
+                conn.request('GET', '/transactions', headers={'X-API-Key': API_KEY})
+                response = conn.getresponse()
+                body = app.json_loads(response.read())
+            finally:
+                conn.close()
+        self.assertEqual((response.status, body), (429, {'detail': 'Rate limit exceeded'}))
+        self.assertEqual(response.getheader('Retry-After'), '30')  # one token per 60 / 2 seconds
+
+    def test_least_recently_seen_client_is_forgotten(self):
+        """Past MAX_TRACKED_CLIENTS the least recently seen IP is dropped, and starts over with a full bucket"""
+        with mock.patch.object(app, 'RATE_LIMIT', 1), mock.patch.object(app, 'MAX_TRACKED_CLIENTS', 3):
+            self.start_clock()
+            self.addCleanup(self.stop_clock)
+            for client_ip in ('a', 'b', 'c'):
+                self.assertTrue(app.Security.rate_limit(client_ip)[0])
+            self.assertFalse(app.Security.rate_limit('a')[0])  # seen again: now the most recent
+            self.assertTrue(app.Security.rate_limit('d')[0])
+            self.assertEqual(list(app.request_counts), ['c', 'a', 'd'])
+            self.assertTrue(app.Security.rate_limit('b')[0])  # forgotten, so a full bucket again
+            self.assertEqual(list(app.request_counts), ['a', 'd', 'b'])
+
+
+class TestLegacyKeyFile(unittest.TestCase):
+    """A plain-Base64 .api_key from before hashing is converted on load"""
+
+    def setUp(self):
+        previous = app.stored_api_key
+        def restore():
+            app.stored_api_key = previous
+            app.Security.verify.cache_clear()
+            if os.path.exists(app.API_KEY_FILE):
+                os.remove(app.API_KEY_FILE)
+        self.addCleanup(restore)
+
+    def load_key_file(self):
+        with redirect_stdout(io.StringIO()):
+            app.setup_api_key()
+
+    def test_old_format_is_rewritten_as_salt_and_digest(self):
+        with open(app.API_KEY_FILE, 'w') as f:
+            f.write(base64.b64encode(b'legacy-key').decode())
+        self.load_key_file()
+        with open(app.API_KEY_FILE) as f:
+            salt, digest = f.read().split(':')
+        self.assertEqual(len(base64.b64decode(salt)), 16)
+        self.assertEqual(len(base64.b64decode(digest)), 32)  # HMAC-SHA256
+        self.assertNotIn(base64.b64encode(b'legacy-key').decode(), salt + digest)
+        self.assertTrue(app.Security.authenticate('legacy-key'))
+        self.assertFalse(app.Security.authenticate('wrong-key'))
+        # The rewritten file loads as salt:digest and still accepts the original key
+        self.load_key_file()
+        self.assertTrue(app.Security.authenticate('legacy-key'))
+
+
+class TestBackgroundWriter(unittest.TestCase):
+    """Changes must reach the transactions file even after a failed write"""
+
+    def setUp(self):
+        reset_store()
+
+    def wait_for_file(self, expected, timeout=5):
+        """Poll the transactions file until it holds expected; fail after timeout seconds"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if app.JSONHandler.read_json(app.TRANSACTIONS_FILE) == expected:
+                return
+            time.sleep(0.02)
+        self.fail(f"{app.TRANSACTIONS_FILE} never held {expected}")
+
+    def test_failed_write_is_retried(self):
+        """One ENOSPC from write_json leaves the writer running, and the change is written on the retry"""
+        write_json = app.JSONHandler.write_json
+        failures = []
+
+        def fail_once(file_path, data):
+            if not failures:
+                failures.append(file_path)
+                raise OSError(errno.ENOSPC, "No space left on device")
+            write_json(file_path, data)
+
+        output = io.StringIO()
+        with mock.patch.object(app.JSONHandler, 'write_json', side_effect=fail_once), \
+                mock.patch.object(app, 'FLUSH_RETRY_DELAY', 0.01), redirect_stdout(output):
+            status, created = request('POST', '/transactions', transaction_body())
+            self.assertEqual(status, 201)
+            self.wait_for_file([created])
+
+        self.assertEqual(failures, [app.TRANSACTIONS_FILE])
+        self.assertIn("Background write failed", output.getvalue())
+        self.assertTrue(app._writer.is_alive())
+
+    def test_mark_dirty_restarts_a_dead_writer(self):
+        """A writer thread that has exited is replaced on the next change"""
+        dead = threading.Thread(target=lambda: None)
+        dead.start()
+        dead.join()
+        with app._store_lock:
+            app._writer = dead
+        # The thread it replaces keeps idling on the event; _flush_lock keeps the two writers apart
+        status, created = request('POST', '/transactions', transaction_body())
+        self.assertEqual(status, 201)
+        self.assertIsNot(app._writer, dead)
+        self.assertTrue(app._writer.is_alive())
+        self.wait_for_file([created])
+
+
+class TestPagination(unittest.TestCase):
+    """GET /transactions pages across POSTs, tombstoned DELETEs and compaction"""
+
+    def setUp(self):
+        reset_store()
+
+    def post(self, count):
+        """POST count transactions; returns the created records"""
+        created = []
+        for _ in range(count):
+            status, transaction = request('POST', '/transactions', transaction_body())
+            self.assertEqual(status, 201)
+            created.append(transaction)
+        return created
+
+    def delete(self, transaction_id):
+        self.assertEqual(request('DELETE', '/transactions/%d' % transaction_id)[0], 200)
+
+    def assertPagesMatch(self, live):
+        """Every (after_id, limit) page equals the live records with a higher id, in id order"""
+        live = sorted(live, key=lambda t: t['id'])
+        highest = live[-1]['id'] if live else 0
+        for after_id in range(highest + 2):
+            for limit in (1, 2, 3, app.PAGE_SIZE):
+                with self.subTest(after_id=after_id, limit=limit):
+                    expected = [t for t in live if t['id'] > after_id][:limit]
+                    with app._store_lock:
+                        page = app.json_loads(app.JSONHandler.encoded_page(after_id, limit))
+                    self.assertEqual(page, expected)
+        # The handler serves the same pages, the cached default page included
+        self.assertEqual(request('GET', '/transactions'), (200, live[:app.PAGE_SIZE]))
+        if live:
+            after_id = live[0]['id']
+            expected = [t for t in live if t['id'] > after_id][:2]
+            self.assertEqual(request('GET', '/transactions?after_id=%d&limit=2' % after_id), (200, expected))
+
+    def walk_pages(self, limit):
+        """Records from following the pages by the last id received, as the API docs describe"""
+        seen, after_id = [], 0
+        for _ in range(len(app._transactions) + 2):  # more pages than rows means the walk never ends
+            status, page = request('GET', '/transactions?after_id=%d&limit=%d' % (after_id, limit))
+            self.assertEqual(status, 200)
+            if not page:
+                return seen
+            seen.extend(page)
+            after_id = page[-1]['id']
+        self.fail("paging by after_id did not reach an empty page")
+
+    def test_pages_follow_after_id(self):
+        """Walking the pages by the last id received returns every transaction once"""
+        created = self.post(5)
+        self.assertEqual(self.walk_pages(2), created)
+
+    def test_after_id_of_a_deleted_transaction(self):
+        """A deleted after_id still starts the page after it, skipping other tombstones"""
+        created = self.post(6)
+        self.delete(3)
+        self.delete(4)
+        self.assertEqual(len(app._deleted), 2)  # below the compaction threshold
+        self.assertEqual(request('GET', '/transactions?after_id=3&limit=2'), (200, created[4:6]))
+        self.assertEqual(request('GET', '/transactions?after_id=2&limit=1'), (200, created[4:5]))
+        self.assertPagesMatch(created[:2] + created[4:])
+
+    def test_compaction_threshold(self):
+        """Tombstones stay until half the list is deleted, then the list and index are rebuilt"""
+        created = self.post(4)
+        self.delete(1)
+        self.assertEqual((len(app._transactions), app._deleted), (4, {0}))
+        self.delete(2)
+        self.assertEqual((len(app._transactions), app._deleted), (2, set()))
+        self.assertEqual(app._tx_index, {3: 0, 4: 1})
+        # The rebuilt index serves the other handlers, and ids are not reused
+        changed = dict(created[3], amount=1)
+        del changed['id']
+        self.assertEqual(request('PUT', '/transactions/4', app.json_dumps(changed)), (200, dict(changed, id=4)))
+        self.delete(3)
+        newest = self.post(1)[0]
+        self.assertEqual(newest['id'], 5)
+        self.assertEqual(request('GET', '/transactions/1')[0], 404)
+        self.assertPagesMatch([dict(changed, id=4), newest])
+
+    def test_interleaved_posts_and_deletes(self):
+        """Pages stay right through a mix of POSTs, DELETEs and compactions"""
+        live = self.post(3)
+        for step in range(8):
+            self.delete(live.pop(step % len(live))['id'])
+            self.assertPagesMatch(live)
+            live.extend(self.post(2))
+            self.assertPagesMatch(live)
+
+    def load_file(self, transactions):
+        """Replace the transactions file by hand, as an edit or import would, and reload it"""
+        app.JSONHandler.flush()
+        app.JSONHandler.write_json(app.TRANSACTIONS_FILE, transactions)
+        app.init_json_files()
+
+    def test_out_of_order_file(self):
+        """A file whose ids are not in ascending order is still paged in id order"""
+        rows = [app.json_loads(transaction_body(id=transaction_id)) for transaction_id in (3, 1, 5, 2)]
+        self.load_file(rows)
+        self.assertFalse(app._ids_ascending)
+        self.assertPagesMatch(rows)
+        created = self.post(1)
+        self.assertEqual(created[0]['id'], 6)
+        self.delete(1)
+        self.assertPagesMatch([row for row in rows if row['id'] != 1] + created)
+
+    def test_duplicate_id_file(self):
+        """after_id moves past every row sharing that id, so paging ends"""
+        rows = [app.json_loads(transaction_body(id=transaction_id, amount=amount))
+                for transaction_id, amount in ((1, 100), (1, 200), (2, 300), (3, 400))]
+        self.load_file(rows)
+        self.assertTrue(app._ids_ascending)
+        self.assertEqual(request('GET', '/transactions?after_id=1&limit=1'), (200, rows[2:3]))
+        self.assertPagesMatch(rows)
+        self.assertEqual(self.walk_pages(2), rows)
+        # A page boundary between two rows that share an id skips the second one, but still ends
+        self.assertEqual([t['id'] for t in self.walk_pages(1)], [1, 2, 3])
+
+    def test_delete_one_of_duplicate_ids(self):
+        """Deleting a row that shares its id leaves the other row reachable by GET, PUT and DELETE"""
+        for ids in ((1, 1, 2, 3), (2, 1, 3, 1)):  # ascending, then out of order
+            with self.subTest(ids=ids):
+                rows = [app.json_loads(transaction_body(id=transaction_id, amount=amount))
+                        for amount, transaction_id in enumerate(ids)]
+                first, second = [row for row in rows if row['id'] == 1]
+                self.load_file(rows)
+                self.delete(1)
+                self.assertEqual(app._deleted, {rows.index(first)})  # tombstoned, not compacted
+                self.assertEqual(request('GET', '/transactions/1'), (200, second))
+                changed = app.json_loads(transaction_body(amount=99))
+                self.assertEqual(request('PUT', '/transactions/1', app.json_dumps(changed)),
+                                 (200, dict(changed, id=1)))
+                self.assertPagesMatch([row for row in rows if row['id'] != 1] + [dict(changed, id=1)])
+                self.delete(1)
+                self.assertEqual(request('GET', '/transactions/1')[0], 404)
+                self.assertEqual(request('DELETE', '/transactions/1')[0], 404)
+
+    def test_str_id_file(self):
+        """A str id loads and is skipped by paging instead of failing every request"""
+        rows = [app.json_loads(transaction_body(id=transaction_id)) for transaction_id in (1, 'TX-9', 2)]
+        self.load_file(rows)
+        self.assertEqual(app._next_id, 3)
+        self.assertPagesMatch([rows[0], rows[2]])
+        self.assertEqual(self.post(1)[0]['id'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
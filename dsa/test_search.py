@@ -1,34 +1,85 @@
 import unittest
-import time
 import sys
-import os
+from timeit import Timer
+from types import MappingProxyType
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Import our actual implementation - relative inside the dsa package (python -m unittest dsa.test_search),
+# plain when run as a script, where this directory is already on sys.path
+if __package__:
+    from .search_comparison import TransactionSearcher, create_sample_transactions, njit
+else:
+    from search_comparison import TransactionSearcher, create_sample_transactions, njit
 
-# Import our actual implementation
-from search_comparison import TransactionSearcher, create_sample_transactions
+
+def time_per_call(stmt, unroll=1, **names):
+    """
+    Seconds per run of stmt - timeit picks the loop count; names are passed as its globals
+    unroll repeats stmt that many times in each pass of timeit's compiled loop, so the loop's own
+    bytecode is paid once per `unroll` runs
+    """
+    number, total = Timer("\n".join([stmt] * unroll), globals=names).autorange()
+    return total / (number * unroll)
+
+
+# Sample-data searchers shared by every test, keyed by dataset size (the tests only read them)
+_SEARCHER_POOL = {}
+
+
+def get_searcher(size):
+    """Searcher over create_sample_transactions(size), built on first request and reused after"""
+    searcher = _SEARCHER_POOL.get(size)
+    if searcher is None:
+        searcher = _SEARCHER_POOL[size] = TransactionSearcher(create_sample_transactions(size))
+    return searcher
+
+
+def get_str_id_searcher(size):
+    """
+    Like get_searcher, but with the ids stored as str - keeps the searcher on the list.index scan
+    and the str-keyed dictionary, so a CountingId target sees every comparison
+    """
+    key = ('str', size)
+    searcher = _SEARCHER_POOL.get(key)
+    if searcher is None:
+        transactions = [dict(t, id=str(t['id'])) for t in create_sample_transactions(size)]
+        searcher = _SEARCHER_POOL[key] = TransactionSearcher(transactions)
+    return searcher
+
+
+class CountingId(str):
+    """str search target that counts the equality checks and hashes done against it"""
+    comparisons = 0
+    hashes = 0
+    
+    def __eq__(self, other):
+        self.comparisons += 1
+        return str.__eq__(self, other)
+    
+    def __hash__(self):
+        self.hashes += 1
+        return str.__hash__(self)
 
 
 class TestTransactionSearcher(unittest.TestCase):
     """Test cases for our transaction search algorithms - MoMo API Project"""
     
-    def setUp(self):
-        """Setup test data that matches our MoMo transaction format"""
-        self.test_transactions = [
+    @classmethod
+    def setUpClass(cls):
+        """
+        Setup test data that matches our MoMo transaction format - built once and shared by the tests,
+        so the rows are read-only mappings: a test that tries to change one fails instead of leaking into the next
+        """
+        cls.test_transactions = tuple(MappingProxyType(row) for row in [
             {'id': 1, 'type': 'payment', 'amount': 5000, 'sender': '36521838', 'receiver': 'Internet Provider', 'timestamp': '2024-06-28T14:30:00'},
             {'id': 2, 'type': 'transfer', 'amount': 2500, 'sender': '25078100001', 'receiver': '25078200001', 'timestamp': '2024-06-28T15:45:00'},
             {'id': 3, 'type': 'withdrawal', 'amount': 10000, 'sender': '25078100002', 'receiver': 'ATM_12345', 'timestamp': '2024-06-28T16:20:00'},
-        ]
-        self.searcher = TransactionSearcher(self.test_transactions)
+        ])
+        cls.searcher = TransactionSearcher(cls.test_transactions)
     
     def test_linear_search_found(self):
         """Test that linear search finds existing transactions"""
-        result = self.searcher.linear_search('2')
-        self.assertIsNotNone(result)
-        self.assertEqual(len(result), 1)
-        self.assertEqual(result[0]['type'], 'transfer')
-        self.assertEqual(result[0]['amount'], 2500)
+        # Exactly the transfer row (id 2), compared as a whole
+        self.assertEqual(self.searcher.linear_search('2'), [self.test_transactions[1]])
     
     def test_linear_search_not_found(self):
         """Test linear search with non-existing transaction"""
@@ -37,53 +88,58 @@ class TestTransactionSearcher(unittest.TestCase):
     
     def test_dictionary_lookup_found(self):
         """Test dictionary lookup with existing transaction"""
-        result = self.searcher.dictionary_lookup('1')
-        self.assertIsNotNone(result)
-        self.assertEqual(len(result), 1)
-        self.assertEqual(result[0]['id'], 1)
-        self.assertEqual(result[0]['sender'], '36521838')
+        # Exactly the payment row (id 1), compared as a whole
+        self.assertEqual(self.searcher.dictionary_lookup('1'), [self.test_transactions[0]])
     
     def test_dictionary_lookup_not_found(self):
         """Test dictionary lookup with non-existing transaction"""
         result = self.searcher.dictionary_lookup('999')
         self.assertIsNone(result)
     
+    def test_linear_search_batch(self):
+        """Test that one batch pass finds the same transactions as separate linear searches"""
+        results = self.searcher.linear_search_batch(['1', 3, '999'])
+        self.assertEqual(set(results), {'1', '3', '999'})
+        self.assertEqual(results['1'], self.searcher.linear_search('1'))
+        self.assertEqual(results['3'], self.searcher.linear_search('3'))
+        self.assertEqual(results['999'], [])
+    
     def test_both_methods_return_same_result(self):
         """Verify both search methods return identical results for same ID"""
-        # Test with ID that exists
-        test_id = '1'
-        linear_result = self.searcher.linear_search(test_id)
-        dict_result = self.searcher.dictionary_lookup(test_id)
-        
-        self.assertEqual(linear_result, dict_result)
-        
-        # Test with ID that doesn't exist
-        linear_result = self.searcher.linear_search('999')
-        dict_result = self.searcher.dictionary_lookup('999')
-        self.assertEqual(len(linear_result), 0)
-        self.assertIsNone(dict_result)
+        # ID that exists, then ID that doesn't; the O(1) lookup runs first in each case
+        for test_id, exists in (('1', True), ('999', False)):
+            with self.subTest(test_id=test_id):
+                dict_result = self.searcher.dictionary_lookup(test_id)
+                if exists:
+                    self.assertIsNotNone(dict_result)
+                    # Both return the stored records themselves: compare identities, not every field
+                    self.assertEqual([id(t) for t in self.searcher.linear_search(test_id)],
+                                     [id(t) for t in dict_result])
+                else:
+                    self.assertIsNone(dict_result)
+                    self.assertEqual(len(self.searcher.linear_search(test_id)), 0)
     
     def test_dictionary_is_faster(self):
         """Test that dictionary lookup is faster than linear search"""
-        # Create larger dataset for meaningful comparison
-        large_transactions = create_sample_transactions(50)
-        searcher = TransactionSearcher(large_transactions)
+        # Larger dataset for meaningful comparison
+        searcher = get_searcher(50)
         
         # Search for last element (worst case for linear search)
         target_id = '50'
-        iterations = 100
         
-        # Time linear search
-        start = time.perf_counter()
-        for _ in range(iterations):
+        # Warm up both searches first, so the one timed first does not run on a cold CPU
+        # (timeit already keeps the garbage collector off while timing)
+        for _ in range(10):
             searcher.linear_search(target_id, verbose=False)
-        linear_time = time.perf_counter() - start
+            searcher.dictionary_lookup(target_id, verbose=False)
+        
+        # Time linear search (unrolled, so the timing loop's overhead is spread over 10 calls)
+        linear_time = time_per_call('search(target_id, verbose=False)', unroll=10,
+                                    search=searcher.linear_search, target_id=target_id)
         
         # Time dictionary lookup
-        start = time.perf_counter()
-        for _ in range(iterations):
-            searcher.dictionary_lookup(target_id, verbose=False)
-        dict_time = time.perf_counter() - start
+        dict_time = time_per_call('search(target_id, verbose=False)', unroll=10,
+                                  search=searcher.dictionary_lookup, target_id=target_id)
         
         self.assertLess(dict_time, linear_time, 
                         "Dictionary lookup should be faster than linear search")
@@ -104,44 +160,89 @@ class TestTransactionSearcher(unittest.TestCase):
 class TestPerformanceScaling(unittest.TestCase):
     """Test performance scaling with different dataset sizes"""
     
+    # Count comparisons instead of timing, so the checks are exact and independent of machine load
+    SIZES = (10, 100, 1000)
+    
+    def counted_search(self, method_name, size):
+        """
+        Search the str-id searcher of that size for its last ID (worst case for linear search)
+        Returns the result and the CountingId target, which holds the work done
+        """
+        target = CountingId(str(size))
+        return getattr(get_str_id_searcher(size), method_name)(target), target
+    
     def test_linear_search_scales_linearly(self):
-        """Verify linear search time increases with dataset size"""
-        sizes = [10, 20, 30]
-        times = []
-        
-        for size in sizes:
-            transactions = create_sample_transactions(size)
-            searcher = TransactionSearcher(transactions)
-            
-            # Search for last element (worst case)
-            start = time.perf_counter()
-            for _ in range(50):  # Fewer iterations for quicker tests
-                searcher.linear_search(str(size), verbose=False)
-            times.append(time.perf_counter() - start)
-        
-        # Verify time increases (rough linear relationship)
-        self.assertGreater(times[1], times[0])
-        self.assertGreater(times[2], times[1])
+        """Verify linear search does one comparison per transaction"""
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                result, target = self.counted_search('linear_search_fast', size)
+                self.assertEqual(len(result), 1)
+                self.assertEqual(target.comparisons, size)
     
     def test_dictionary_lookup_constant_time(self):
-        """Verify dictionary lookup time remains relatively constant"""
-        sizes = [10, 30, 50]
-        times = []
-        
-        for size in sizes:
-            transactions = create_sample_transactions(size)
-            searcher = TransactionSearcher(transactions)
-            
-            start = time.perf_counter()
-            for _ in range(50):
-                searcher.dictionary_lookup(str(size), verbose=False)
-            times.append(time.perf_counter() - start)
-        
-        # Times should be relatively similar (within reasonable bounds)
-        max_time = max(times)
-        min_time = min(times)
-        # Allow for some variance but should be much more consistent than linear search
-        self.assertLess(max_time / min_time, 3.0)
+        """Verify dictionary lookup work does not grow with dataset size"""
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                # One hash and at most one key comparison, however many transactions there are
+                result, target = self.counted_search('dictionary_lookup', size)
+                self.assertEqual(len(result), 1)
+                self.assertEqual(target.hashes, 1)
+                self.assertLessEqual(target.comparisons, 1)
+
+
+@unittest.skipUnless(njit, "numba and numpy are not installed")
+class TestNumbaScan(unittest.TestCase):
+    """The compiled int id scan must find exactly what the list.index scan finds"""
+    
+    # Duplicates, negatives and the int64 edge, ending on a repeated id
+    IDS = (5, 1, 5, 7, -3, 2 ** 63 - 1, -2 ** 63, 5)
+    TARGETS = ('5', '1', '7', '-3', '9', str(2 ** 63 - 1), str(-2 ** 63),
+               '01', '+5', ' 5', '5.0', '-0', 'abc', '', str(2 ** 63), str(-2 ** 63 - 1))
+    
+    def assertSameMatches(self, transactions):
+        """numba and list.index scans return the same records for every target"""
+        compiled = TransactionSearcher(transactions)
+        plain = TransactionSearcher(transactions)
+        plain._int_ids = None  # forces the list.index scan
+        for target in self.TARGETS:
+            with self.subTest(target=target):
+                # The str compare the verbose search does is the reference for both
+                expected = [id(t) for t in transactions if str(t['id']) == target]
+                self.assertEqual([id(t) for t in compiled.linear_search_fast(target)], expected)
+                self.assertEqual([id(t) for t in plain.linear_search_fast(target)], expected)
+        return compiled
+    
+    def test_matches_list_index_scan(self):
+        """Duplicates, '01'-style targets and out-of-int64 targets agree with the list.index path"""
+        compiled = self.assertSameMatches([{'id': transaction_id} for transaction_id in self.IDS])
+        self.assertIsNotNone(compiled._int_ids)  # the compiled scan really ran
+    
+    def test_out_of_int64_ids_fall_back(self):
+        """An id outside int64 leaves the searcher on the list.index scan, with the same results"""
+        compiled = self.assertSameMatches([{'id': transaction_id} for transaction_id in self.IDS + (2 ** 63,)])
+        self.assertIsNone(compiled._int_ids)
+
+
+# Tests run by run_all_tests, listed explicitly so the suite is built without reflection
+# (add new test methods here as well)
+SEARCHER_TESTS = (
+    'test_linear_search_found',
+    'test_linear_search_not_found',
+    'test_dictionary_lookup_found',
+    'test_dictionary_lookup_not_found',
+    'test_linear_search_batch',
+    'test_both_methods_return_same_result',
+    'test_dictionary_is_faster',
+    'test_edge_cases',
+)
+NUMBA_TESTS = (
+    'test_matches_list_index_scan',
+    'test_out_of_int64_ids_fall_back',
+)
+SCALING_TESTS = (
+    'test_linear_search_scales_linearly',
+    'test_dictionary_lookup_constant_time',
+)
 
 
 def run_all_tests():
@@ -153,12 +254,12 @@ def run_all_tests():
     print("\nRunning test suite...\n")
     
     # Create test suite
-    loader = unittest.TestLoader()
     suite = unittest.TestSuite()
     
     # Add all test cases
-    suite.addTests(loader.loadTestsFromTestCase(TestTransactionSearcher))
-    suite.addTests(loader.loadTestsFromTestCase(TestPerformanceScaling))
+    suite.addTests(TestTransactionSearcher(name) for name in SEARCHER_TESTS)
+    suite.addTests(TestNumbaScan(name) for name in NUMBA_TESTS)
+    suite.addTests(TestPerformanceScaling(name) for name in SCALING_TESTS)
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)